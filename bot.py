@@ -1,17 +1,15 @@
 """
 This module defines utility classes and functions for implementing a game-playing bot 
-and tracking game states in the Hexapawn game. It provides the following functionalities:
+in the Hexapawn game. It provides the following functionalities:
 
-1. **Node Class**:
-   - Represents a node in the game tree, storing the current state, parent state, and action taken.
-   - Enables traversal of the game tree to analyze the sequence of moves.
-
-2. **Mistake Class**:
+1. **Mistake Class**:
    - Represents a mistake as a combination of a board configuration and a faulty action.
-   - Provides comparison capabilities for identifying repeated mistakes.
+   - Provides comparison and hashing for identifying repeated mistakes.
 
-3. **Knowledge Class**:
-   - Tracks known mistakes made during gameplay.
+2. **Knowledge Class**:
+   - Tracks known mistakes in the order they were learned, with a set of
+     canonical `Mistake`s for lookups.
+   - Treats mirror-image configurations as the same position (see `canonical`).
    - Evaluates configurations to detect deadlock situations ("Catch-22" scenarios).
    - Supports notifying and checking mistakes to enhance bot decision-making.
 
@@ -25,45 +23,42 @@ Example Usage:
     if knowledge.is_mistake(configuration, action):
         print("This move is a known mistake!")
 """
-from typing import Self
-from hexapawn import actions, BLACK, display
-
-
-class Node:
-    """Represents a state in the game tree."""
-    def __init__(self, state: list[list[str]], parent: Self | None, action: list[tuple[int, int]]):
-        self.state = state
-        self.parent = parent
-        self.action = action
+from collections import Counter
+from collections.abc import Sequence
+from hexapawn import actions, BLACK, COLS, display, mirror
 
-    def __repr__(self):
-        return f"Node(state={self.state}, parent={self.parent}, action={self.action})"
 
-    def __str__(self):
-        """Returns a readable string representation of the node and its ancestry."""
-        output = []
-        temp = self
-        while temp:
-            output.append(f"State:\n{temp.state}")
-            output.append(f"Action: {temp.action}\n")
-            temp = temp.parent
-        return "\n".join(output)
+def canonical(board: int,
+              action: Sequence[tuple[int, int]]) -> tuple[int, tuple[tuple[int, int], ...]]:
+    """Returns the board and action in the orientation shared by the board and its mirror image."""
+    reflected = mirror(board)
+    if reflected < board:
+        return reflected, tuple((i, COLS - 1 - j) for i, j in action)
+    return board, tuple(action)
 
 
 class Mistake:
     """Represents a mistake, which is a configuration and a faulty action."""
-    def __init__(self, configuration: list[list[str]], fault_action: list[tuple[int, int]]):
+    __slots__ = ("configuration", "fault_action", "_hash")
+
+    def __init__(self, configuration: int, fault_action: list[tuple[int, int]]):
         self.configuration = configuration
-        self.fault_action = fault_action
+        self.fault_action = tuple(map(tuple, fault_action))
+        self._hash = hash((self.configuration, self.fault_action))
 
     def __eq__(self, other):
         if not isinstance(other, Mistake):
             return NotImplemented
+        if self._hash != other._hash:
+            return False
         return (
             self.configuration == other.configuration and
             self.fault_action == other.fault_action
         )
 
+    def __hash__(self):
+        return self._hash
+
     def __repr__(self):
         display(self.configuration)
         print(f"Faulty Action: {self.fault_action[0]} -> {self.fault_action[1]}")
@@ -74,18 +69,24 @@ class Knowledge:
     """Tracks and evaluates mistakes to improve gameplay."""
     def __init__(self):
         self.mistakes: list[Mistake] = []
+        self._known: set[Mistake] = set()
+        self._count: Counter[int] = Counter()
 
     def notify(self, mistake: Mistake):
         """Adds a mistake to the knowledge base."""
+        canon = Mistake(*canonical(mistake.configuration, mistake.fault_action))
+        if canon in self._known:
+            return
+        self._known.add(canon)
+        self._count[canon.configuration] += 1
         self.mistakes.append(mistake)
 
-    def is_mistake(self, configuration: list[list[str]], action: list[tuple[int, int]]) -> bool:
+    def is_mistake(self, configuration: int, action: list[tuple[int, int]]) -> bool:
         """Checks if a given configuration and action represent a known mistake."""
-        return Mistake(configuration, action) in self.mistakes
+        return Mistake(*canonical(configuration, action)) in self._known
 
-    def catch22(self, configuration: list[list[str]]) -> bool:
+    def catch22(self, configuration: int) -> bool:
         """Determines if the configuration is a deadlock situation for the player."""
-        possible_moves = actions(configuration, BLACK)
-        total_moves = sum(len(moves) for moves in possible_moves.values())
-        fault_tally = sum(1 for mistake in self.mistakes if mistake.configuration == configuration)
-        return total_moves - 1 == fault_tally
+        configuration, _ = canonical(configuration, ())
+        total_moves = len(actions(configuration, BLACK))
+        return total_moves - 1 == self._count.get(configuration, 0)
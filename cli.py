@@ -1,5 +1,10 @@
-from bot import Knowledge, Mistake, Node
-from hexapawn import actions, BLACK, display, initial_state, result, terminal, utility, WHITE
+import sys
+
+from bot import Knowledge, Mistake
+from hexapawn import (
+    BLACK, display, get, initial_state, next_player, result, terminal_info, undo, UndoRecord, WHITE
+)
+from solve import solve
 
 
 CONTROLS: dict[str, tuple[int, int]] = {
@@ -7,7 +12,6 @@ CONTROLS: dict[str, tuple[int, int]] = {
     "4": (1, 0), "5": (1, 1), "6": (1, 2),
     "1": (2, 0), "2": (2, 1), "3": (2, 2),
 }
-M, N = 3, 3
 
 
 def white_chance() -> list[tuple[int, int]]:
@@ -30,65 +34,70 @@ def retry() -> bool:
     return response == "y"
 
 
-def review_reflect(knowledge: Knowledge, history: Node | None) -> None:
-    """Analyzes and logs mistakes for reflection."""
-    while history and knowledge.catch22(history.state):
-        mistake = Mistake(history.state, history.action)
-        knowledge.notify(mistake)
-        history = history.parent
+def review_reflect(knowledge: Knowledge, board: int, history: list[UndoRecord]) -> None:
+    """Analyzes and logs mistakes for reflection.
+
+    Unwinds the game from the final board, blaming Black's latest move and
+    climbing further back while the position it left was a Catch-22.
+    """
+    while history:
+        record = history.pop()
+        depart, dest, _ = record
+        mover = get(board, *dest)
+        board = undo(board, record)
+        if mover != BLACK:
+            continue
+        deadlock = knowledge.catch22(board)
+        knowledge.notify(Mistake(board, [depart, dest]))
+        if not deadlock:
+            break
         print("Climbing up the game tree...")
-    if history:
-        knowledge.notify(Mistake(history.state, history.action))
 
 
-def play() -> None:
-    """Main function to handle the game loop."""
-    game_board = initial_state(M, N)
-    chance = [WHITE, BLACK]
-    history = None
+def play(perfect: bool = False) -> None:
+    """Main function to handle the game loop. With `perfect`, Black plays the solved strategy."""
+    game_board = initial_state()
+    turn = WHITE
+    history: list[UndoRecord] = []
     knowledge = Knowledge()
 
     while True:
         display(game_board)
 
-        if terminal(game_board, chance[0]):
-            if utility(game_board, chance[0]) == WHITE:
+        game_over, winner, possible_moves = terminal_info(game_board, turn)
+        if game_over:
+            if winner == WHITE and not perfect:
                 print("Reviewing the mistakes...")
-                review_reflect(knowledge, history)
+                review_reflect(knowledge, game_board, history)
 
             if retry():
-                game_board = initial_state(M, N)
-                chance = [WHITE, BLACK]
-                history = None
+                game_board = initial_state()
+                turn = WHITE
+                history = []
             else:
                 break
             continue
 
-        if chance[0] == WHITE:
+        if turn == WHITE:
             depart, dest = white_chance()
+        elif perfect:
+            _, (depart, dest) = solve(game_board, BLACK)
         else:
-            possible_moves = actions(game_board, chance[0]).items()
-            for pawn, moves in possible_moves:
-                for move in moves:
-                    if not knowledge.is_mistake(game_board, [pawn, move]):
-                        depart, dest = pawn, move
-                        break
-                else:
-                    continue
-                break
+            for depart, dest in possible_moves:
+                if not knowledge.is_mistake(game_board, [depart, dest]):
+                    break
             else:
                 # Handle no valid moves case (shouldn't normally occur)
-                depart, (dest, *_) = list(possible_moves)[0]
+                depart, dest = possible_moves[0]
                 assert False  # Shouldn't happen in a valid game
 
-            history = Node(game_board, history, [depart, dest])
-
+        history.append((depart, dest, get(game_board, *dest)))
         game_board = result(game_board, depart, dest)
         print("*" * 30)
-        chance.reverse()
+        turn = next_player(turn)
 
     display_flaws(knowledge.mistakes)
 
 
 if __name__ == "__main__":
-    play()
+    play(perfect="--perfect" in sys.argv[1:])
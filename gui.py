@@ -1,9 +1,14 @@
+import sys
+
 import pygame
 from pygame import Rect, mouse, Surface
 from pygame.rect import RectType
 
-from bot import Knowledge, Mistake, Node
-from hexapawn import actions, BLACK, display, initial_state, result, terminal, utility, WHITE
+from bot import Knowledge, Mistake
+from hexapawn import (
+    BLACK, display, get, initial_state, next_player, result, terminal_info, undo, UndoRecord, WHITE
+)
+from solve import solve
 
 ROWS = 3
 GAP = 1
@@ -52,20 +57,20 @@ def clicked_index() -> tuple[int, int]:
     return y // TILE_SIZE, x // TILE_SIZE
 
 
-def is_white_pawn(board: list[list[str]], index: tuple[int, int]) -> bool:
+def is_white_pawn(board: int, index: tuple[int, int]) -> bool:
     """Checks if a specific index contains a white pawn."""
     i, j = index
-    return 0 <= i < ROWS and 0 <= j < ROWS and board[i][j] == WHITE
+    return 0 <= i < ROWS and 0 <= j < ROWS and get(board, i, j) == WHITE
 
 
-def tessellate(w: int, h: int) -> list[list[Rect]]:
-    """Creates a grid of tiles on the screen."""
+def tessellate(surface: Surface, w: int, h: int) -> list[list[Rect]]:
+    """Draws a grid of tiles onto the surface and returns the tile rects."""
     start = BORDER_GAP
     stop = DIMENSION[0] - BORDER_GAP
     return [
         [
             pygame.draw.rect(
-                screen,
+                surface,
                 TILE_COLOR,
                 (j, i, w - 2, h - 2),
                 TILE_BORDER_THICKNESS,
@@ -76,45 +81,55 @@ def tessellate(w: int, h: int) -> list[list[Rect]]:
     ]
 
 
-def locate_pawns(board: list[list[str]], table: list[list[Rect]]) -> list[tuple[Surface, Rect]]:
-    """Locates pawns on the board and positions them on the screen."""
-    pawns = []
+def locate_pawns(board: int,
+                 table: list[list[Rect]]) -> dict[tuple[int, int], tuple[Surface, Rect]]:
+    """Locates pawns on the board and positions them on the screen, keyed by board index."""
+    pawn_index = {}
     for i, row in enumerate(table):
         for j, tile in enumerate(row):
-            if board[i][j] == WHITE:
+            piece = get(board, i, j)
+            if piece == WHITE:
                 pawn = white_rect.copy()
                 pawn.topleft = fit_piece(tile, pawn)
-                pawns.append((white_img, pawn))
-            elif board[i][j] == BLACK:
+                pawn_index[(i, j)] = (white_img, pawn)
+            elif piece == BLACK:
                 pawn = black_rect.copy()
                 pawn.topleft = fit_piece(tile, pawn)
-                pawns.append((black_img, pawn))
-    return pawns
+                pawn_index[(i, j)] = (black_img, pawn)
+    return pawn_index
 
 
-def update_pawn_state(pawns: list[tuple[Surface, Rect]]) -> None:
-    """Updates the positions of pawns on the screen."""
-    for pawn_img, pawn_rect in pawns:
-        screen.blit(pawn_img, pawn_rect.topleft)
+def move_pawn(pawn_index: dict[tuple[int, int], tuple[Surface, Rect]],
+              table: list[list[Rect]],
+              depart: tuple[int, int],
+              dest: tuple[int, int]) -> None:
+    """Moves a pawn to another tile, dropping any pawn it captures there."""
+    pawn = pawn_index.pop(depart)
+    i, j = dest
+    pawn[1].topleft = fit_piece(table[i][j], pawn[1])
+    pawn_index[dest] = pawn
 
 
-def clicked_pawn(pawns: list[tuple[Surface, Rect]]) -> Rect:
-    """Returns the pawn rect that was clicked."""
-    x, y = mouse.get_pos()
-    for _, pawn_rect in pawns:
-        if pawn_rect.collidepoint(x, y):
-            return pawn_rect
-    raise AssertionError("No pawn was clicked.")
+def update_pawn_state(pawn_index: dict[tuple[int, int], tuple[Surface, Rect]]) -> None:
+    """Updates the positions of pawns on the screen."""
+    for pawn_img, pawn_rect in pawn_index.values():
+        screen.blit(pawn_img, pawn_rect.topleft)
 
 
-def review_reflect(knowledge: Knowledge, history: Node | None) -> None:
-    """Reviews and reflects on mistakes during the game."""
-    while history and knowledge.catch22(history.state):
-        knowledge.notify(Mistake(history.state, history.action))
-        history = history.parent
+def review_reflect(knowledge: Knowledge, board: int, history: list[UndoRecord]) -> None:
+    """Reviews and reflects on mistakes during the game, undoing moves from the final board."""
+    while history:
+        record = history.pop()
+        depart, dest, _ = record
+        mover = get(board, *dest)
+        board = undo(board, record)
+        if mover != BLACK:
+            continue
+        deadlock = knowledge.catch22(board)
+        knowledge.notify(Mistake(board, [depart, dest]))
+        if not deadlock:
+            break
         print("Climbing up...")
-    if history:
-        knowledge.notify(Mistake(history.state, history.action))
 
 
 def display_banner(message: str) -> None:
@@ -147,76 +162,85 @@ def retry() -> bool:
                 return True
 
 
-def play() -> None:
-    """Main game loop."""
-    game_board = initial_state(ROWS, ROWS)
-    chance = [WHITE, BLACK]
-    history = None
+def play(perfect: bool = False) -> None:
+    """Main game loop. With `perfect`, Black plays the solved strategy instead of learning."""
+    game_board = initial_state()
+    turn = WHITE
+    history: list[UndoRecord] = []
     knowledge = Knowledge()
     try_again = True
 
-    table = tessellate(TILE_SIZE, TILE_SIZE)
-    pawns = locate_pawns(game_board, table)
+    grid = Surface(DIMENSION)
+    grid.fill(DARK)
+    table = tessellate(grid, TILE_SIZE, TILE_SIZE)
+    pawn_index = locate_pawns(game_board, table)
     dragging = False
     cursor_pawn = None
     pawn_selected = None
     running = True
 
     while running and try_again:
-        if terminal(game_board, chance[0]):
-            if utility(game_board, chance[0]) == WHITE:
+        game_over, winner, possible_moves = terminal_info(game_board, turn)
+        if game_over:
+            if winner == WHITE and not perfect:
                 print("Reviewing the mistakes...")
-                review_reflect(knowledge, history)
+                review_reflect(knowledge, game_board, history)
             display(game_board)
             try_again = retry()
             if try_again:
-                game_board = initial_state(ROWS, ROWS)
-                pawns = locate_pawns(game_board, table)
-                chance = [WHITE, BLACK]
-                history = None
+                game_board = initial_state()
+                pawn_index = locate_pawns(game_board, table)
+                turn = WHITE
+                history = []
             continue
 
-        if chance[0] == WHITE:
+        if turn == WHITE:
             made_a_move = False
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN and \
-                        is_white_pawn(game_board, clicked_index()):
-                    dragging = True
-                    pawn_selected = clicked_index()
-                    cursor_pawn = clicked_pawn(pawns)
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    index = clicked_index()
+                    if is_white_pawn(game_board, index):
+                        dragging = True
+                        pawn_selected = index
+                        cursor_pawn = pawn_index[index][1]
                 elif event.type == pygame.MOUSEMOTION and dragging:
-                    cursor_pawn.topleft = (mouse.get_pos()[0] - 50, mouse.get_pos()[1] - 50)
+                    x, y = mouse.get_pos()
+                    cursor_pawn.topleft = (x - 50, y - 50)
                 elif event.type == pygame.MOUSEBUTTONUP and dragging:
                     dragging = False
                     pawn_action = clicked_index()
-                    if pawn_action in actions(game_board, WHITE).get(pawn_selected, []):
+                    if (pawn_selected, pawn_action) in possible_moves:
+                        history.append((pawn_selected, pawn_action, get(game_board, *pawn_action)))
                         game_board = result(game_board, pawn_selected, pawn_action)
+                        move_pawn(pawn_index, table, pawn_selected, pawn_action)
                         made_a_move = True
-                    pawns = locate_pawns(game_board, table)
+                    else:
+                        move_pawn(pawn_index, table, pawn_selected, pawn_selected)
 
             if made_a_move:
-                chance.reverse()
+                turn = next_player(turn)
         else:
-            for pawn, moves in actions(game_board, BLACK).items():
-                for move in moves:
-                    if not knowledge.is_mistake(game_board, [pawn, move]):
-                        history = Node(game_board, history, [pawn, move])
-                        game_board = result(game_board, pawn, move)
-                        pawns = locate_pawns(game_board, table)
-                        break
-                else:
-                    continue
+            if perfect:
+                choices = (solve(game_board, BLACK)[1],)
+            else:
+                choices = (
+                    (pawn, move) for pawn, move in possible_moves
+                    if not knowledge.is_mistake(game_board, [pawn, move])
+                )
+            for pawn, move in choices:
+                history.append((pawn, move, get(game_board, *move)))
+                game_board = result(game_board, pawn, move)
+                move_pawn(pawn_index, table, pawn, move)
                 break
-            chance.reverse()
+            turn = next_player(turn)
 
-        screen.fill(DARK)
-        tessellate(TILE_SIZE, TILE_SIZE)
-        update_pawn_state(pawns)
+        screen.blit(grid, (0, 0))
+        update_pawn_state(pawn_index)
         pygame.display.flip()
 
 
 if __name__ == "__main__":
-    play()
+    play(perfect="--perfect" in sys.argv[1:])
     pygame.quit()
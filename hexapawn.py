@@ -1,10 +1,15 @@
 """
 This module provides utility functions for managing and manipulating the game state
-of Hexapawn, a mxn grid strategy game. It defines functions for initializing the game board,
-generating possible moves for each player, and evaluating the game state. The key functionality
-includes state representation, move generation, result calculation, and
+of Hexapawn, a ROWS x COLS grid strategy game. It defines functions for initializing the game
+board, generating possible moves for each player, and evaluating the game state. The key
+functionality includes state representation, move generation, result calculation, and
 utility checks for win/loss conditions.
 
+The board is packed into a single integer with 2 bits per cell. Cell (i, j) lives at
+bit offset `2 * (COLS * i + j)`, so a board is hashable, compares in one step and can
+be used directly as a dictionary key. `actions`, `result` and `terminal_info`
+are pure functions of the packed board, so their results are memoized.
+
 The following constants represent the different types of pieces:
     - WHITE: White player's pawn
     - BLACK: Black player's pawn
@@ -14,43 +19,64 @@ The following constants represent the different types of pieces:
     - EMPTY_JI: Symbol for empty space in the display
 
 Functions:
-    - initial_state(m: int, n: int) -> list[list[str]]:
-        Initializes the Hexapawn board with the given dimensions (m x n),
+    - get(board: int, i: int, j: int) -> int:
+        Returns the piece at the given cell.
+
+    - put(board: int, i: int, j: int, piece: int) -> int:
+        Returns a new board with the given cell set to `piece`.
+
+    - bitboard(board: int, piece: int) -> int:
+        Returns a one-bit-per-cell mask of the cells holding `piece`.
+
+    - mirror(board: int) -> int:
+        Returns the board reflected left to right.
+
+    - initial_state() -> int:
+        Initializes the Hexapawn board,
         placing the white pawns on the last row and black pawns on the first row.
 
-    - display(board: list[list[str]]) -> None:
-        Displays the current board in a human-readable format using `tabulate`.
+    - render(board: int) -> str:
+        Formats the board as a grid using `tabulate`. The result is memoized.
+
+    - display(board: int) -> None:
+        Prints the rendered board.
 
-    - next_player(turn: str) -> str:
+    - next_player(turn: int) -> int:
         Returns the opponent player based on the current turn.
 
-    - actions(board: list[list[str]], turn: str) -> dict[tuple[int, int], list[tuple[int, int]]]:
-        Generates all possible moves for the current player (White or Black),
+    - actions(board: int, turn: int) -> tuple[Move, ...]:
+        Generates all possible (depart, dest) moves for the current player (White or Black),
         considering forward and diagonal moves.
 
-    - result(board: list[list[str]],
+    - result(board: int,
              depart: tuple[int, int],
-             dest: tuple[int, int]) -> list[list[str]]:
+             dest: tuple[int, int]) -> int:
         Returns a new board state after applying a move from the
         'depart' position to the 'dest' position.
 
-    - terminal(board: list[list[str]], turn: str) -> bool:
+    - undo(board: int, record: UndoRecord) -> int:
+        Reverts a move recorded as (depart, dest, captured piece).
+
+    - terminal_info(board: int, turn: int) -> tuple[bool, int | None, tuple[Move, ...]]:
+        Checks for a terminal state and reports the winner along with the
+        moves available to `turn`, so callers need not call `actions` again.
+
+    - terminal(board: int, turn: int) -> bool:
         Checks if the current game state is terminal,
         (i.e., if a player has won or if the game is trapped).
 
-    - utility(board: list[list[str]], turn: str) -> str:
+    - utility(board: int, turn: int) -> int:
         Evaluates the current board state to determine the winner.
-        Returns 'WHITE' or 'BLACK' based on the game result.
+        Returns WHITE or BLACK based on the game result.
 """
 
 
-import copy
-from collections import defaultdict
+from functools import lru_cache
 from tabulate import tabulate
 
-WHITE = "WHITE_PAWN"
-BLACK = "BLACK_PAWN"
-EMPTY = "EMPTY"
+EMPTY = 0
+WHITE = 1
+BLACK = 2
 
 WHITE_JI = "W"
 BLACK_JI = "B"
@@ -62,38 +88,123 @@ LOGOS = {
     EMPTY: EMPTY_JI,
 }
 
+ROWS, COLS = 3, 3
+
+# (depart, dest)
+Move = tuple[tuple[int, int], tuple[int, int]]
+# (depart, dest, piece that stood on dest before the move)
+UndoRecord = tuple[tuple[int, int], tuple[int, int], int]
+CELL_BITS = 2
+CELL_MASK = (1 << CELL_BITS) - 1
+
+
+def _offset(i: int, j: int) -> int:
+    """Returns the bit offset of a cell within the packed board."""
+    return CELL_BITS * (COLS * i + j)
+
+
+# Bit offset of every cell, precomputed so get/put do no index arithmetic.
+OFFSETS = tuple(tuple(_offset(i, j) for j in range(COLS)) for i in range(ROWS))
+
+COLUMN_MASKS = [
+    sum(CELL_MASK << _offset(i, j) for i in range(ROWS))
+    for j in range(COLS)
+]
+
+# One bit per cell (the low bit of each 2-bit slot), used for per-piece bitboards.
+CELL_BITBOARD = sum(1 << _offset(i, j) for i in range(ROWS) for j in range(COLS))
+FIRST_COLUMN = COLUMN_MASKS[0] & CELL_BITBOARD
+LAST_COLUMN = COLUMN_MASKS[-1] & CELL_BITBOARD
+FIRST_ROW = sum(1 << _offset(0, j) for j in range(COLS))
+LAST_ROW = sum(1 << _offset(ROWS - 1, j) for j in range(COLS))
+
+
+def get(board: int, i: int, j: int) -> int:
+    """Returns the piece at the given cell."""
+    return (board >> OFFSETS[i][j]) & CELL_MASK
+
+
+def put(board: int, i: int, j: int, piece: int) -> int:
+    """Returns a copy of the board with the given cell set to `piece`."""
+    s = OFFSETS[i][j]
+    return (board & ~(CELL_MASK << s)) | (piece << s)
+
+
+def _neighbors(direction: int) -> tuple[tuple[int, int, Move], ...]:
+    """Lists every on-board (rank, dest bit, move) for pawns advancing in `direction`.
+
+    Rank 0 is the forward step, 1 the left capture and 2 the right capture.
+    """
+    table = []
+    for i in range(ROWS):
+        fi = i + direction
+        if not 0 <= fi < ROWS:
+            continue
+        for j in range(COLS):
+            for rank, dj in enumerate((0, -1, 1)):
+                if 0 <= j + dj < COLS:
+                    table.append((rank, 1 << _offset(fi, j + dj), ((i, j), (fi, j + dj))))
+    return tuple(table)
+
+
+NEIGHBORS = {
+    WHITE: _neighbors(-1),
+    BLACK: _neighbors(1),
+}
+
+
+def bitboard(board: int, piece: int) -> int:
+    """Returns a mask with the low bit of every cell holding `piece` set."""
+    return (board >> (piece - 1)) & CELL_BITBOARD
+
+
+def _shift(bits: int, cells: int) -> int:
+    """Shifts a bitboard by the given number of cells (negative shifts go right)."""
+    offset = CELL_BITS * cells
+    return bits << offset if offset >= 0 else bits >> -offset
+
 
-def initial_state(m: int, n: int) -> list[list[str]]:
+def mirror(board: int) -> int:
+    """Returns the board reflected left to right."""
+    mirrored = 0
+    for j, mask in enumerate(COLUMN_MASKS):
+        mirrored |= _shift(board & mask, COLS - 1 - 2 * j)
+    return mirrored
+
+
+def initial_state() -> int:
     """Creates the initial state of the board."""
-    board = [[EMPTY for _ in range(n)] for _ in range(m)]
-    for j in range(n):
-        board[0][j] = BLACK
-        board[m - 1][j] = WHITE
+    board = 0
+    for j in range(COLS):
+        board = put(board, 0, j, BLACK)
+        board = put(board, ROWS - 1, j, WHITE)
     return board
 
 
-def display(board: list[list[str]]) -> None:
-    """Displays the board in a grid format."""
+@lru_cache(maxsize=None)
+def render(board: int) -> str:
+    """Formats the board in a grid format."""
     formatted_board = [
-        [LOGOS[piece] for piece in row]
-        for row in board
+        [LOGOS[get(board, i, j)] for j in range(COLS)]
+        for i in range(ROWS)
     ]
-    print(tabulate(formatted_board, tablefmt="grid"))
+    return tabulate(formatted_board, tablefmt="grid")
+
+
+def display(board: int) -> None:
+    """Displays the board in a grid format."""
+    print(render(board))
 
 
-def next_player(turn: str) -> str:
+def next_player(turn: int) -> int:
     """Returns the next player based on the current turn."""
-    if turn == WHITE:
-        return BLACK
-    if turn == BLACK:
-        return WHITE
-    assert False, "Invalid player turn."
+    assert turn in (WHITE, BLACK), "Invalid player turn."
+    return turn ^ (WHITE ^ BLACK)
 
 
-def actions(board: list[list[str]], turn: str) -> dict[tuple[int, int], list[tuple[int, int]]]:
-    """Generates possible moves for the given player's turn."""
-    m, n = len(board), len(board[0])
-    possible_moves = defaultdict(list)
+@lru_cache(maxsize=None)
+def actions(board: int, turn: int) -> tuple[Move, ...]:
+    """Generates possible (depart, dest) moves for the given player's turn."""
 
     if turn == WHITE:
         direction, opponent = -1, BLACK
@@ -102,66 +213,62 @@ def actions(board: list[list[str]], turn: str) -> dict[tuple[int, int], list[tup
     else:
         assert False, "Invalid player turn."
 
-    for i, row in enumerate(board):
-        for j, piece in enumerate(row):
-            if piece != turn:
-                continue
-
-            forward = (i + direction, j)
-            diag_left = (i + direction, j - 1)
-            diag_right = (i + direction, j + 1)
-
-            if 0 <= forward[0] < m and board[forward[0]][forward[1]] == EMPTY:
-                possible_moves[(i, j)].append(forward)
-
-            if 0 <= diag_left[0] < m and \
-                    0 <= diag_left[1] < n and \
-                    board[diag_left[0]][diag_left[1]] == opponent:
-                possible_moves[(i, j)].append(diag_left)
-
-            if 0 <= diag_right[0] < m and \
-                    0 <= diag_right[1] < n and \
-                    board[diag_right[0]][diag_right[1]] == opponent:
-                possible_moves[(i, j)].append(diag_right)
-
-    return dict(possible_moves)
+    own = bitboard(board, turn)
+    rival = bitboard(board, opponent)
+    empty = CELL_BITBOARD & ~(own | rival)
+    hits = (
+        _shift(own, direction * COLS) & empty,
+        _shift(own & ~FIRST_COLUMN, direction * COLS - 1) & rival,
+        _shift(own & ~LAST_COLUMN, direction * COLS + 1) & rival,
+    )
+    return tuple(move for rank, dest, move in NEIGHBORS[turn] if hits[rank] & dest)
 
 
-def result(board: list[list[str]],
+@lru_cache(maxsize=None)
+def result(board: int,
            depart: tuple[int, int],
-           dest: tuple[int, int]) -> list[list[str]]:
+           dest: tuple[int, int]) -> int:
     """Applies a move and returns the resulting board."""
-    m, n = len(board), len(board[0])
     i, j = depart
     di, dj = dest
-    assert 0 <= di < m and 0 <= dj < n, "Move out of board bounds."
+    assert 0 <= di < ROWS and 0 <= dj < COLS, "Move out of board bounds."
 
-    new_board = copy.deepcopy(board)
-    new_board[di][dj] = new_board[i][j]
-    new_board[i][j] = EMPTY
-    return new_board
+    piece = get(board, i, j)
+    return put(put(board, di, dj, piece), i, j, EMPTY)
 
 
-def terminal(board: list[list[str]], turn: str) -> bool:
-    """Checks if the game has reached a terminal state."""
-    white_reached_top = any(piece == WHITE for piece in board[0])
-    black_reached_bottom = any(piece == BLACK for piece in board[-1])
-    white_trapped = turn == WHITE and not actions(board, WHITE)
-    black_trapped = turn == BLACK and not actions(board, BLACK)
+def undo(board: int, record: UndoRecord) -> int:
+    """Reverts a move and returns the board as it was before it."""
+    (i, j), (di, dj), captured = record
+    piece = get(board, di, dj)
+    return put(put(board, i, j, piece), di, dj, captured)
 
-    return white_reached_top or black_reached_bottom or white_trapped or black_trapped
 
+@lru_cache(maxsize=None)
+def terminal_info(board: int,
+                  turn: int) -> tuple[bool, int | None, tuple[Move, ...]]:
+    """Returns whether the game is over, the winner (or None), and the moves available to `turn`.
+
+    A pawn reaching the far row ends the game before any moves are generated,
+    in which case the returned moves are empty.
+    """
+    if bitboard(board, WHITE) & FIRST_ROW:
+        return True, WHITE, ()
+    if bitboard(board, BLACK) & LAST_ROW:
+        return True, BLACK, ()
+    possible_moves = actions(board, turn)
+    if not possible_moves:
+        return True, next_player(turn), possible_moves
+    return False, None, possible_moves
 
-def utility(board: list[list[str]], turn: str) -> str:
-    """Evaluates the utility of the current board."""
-    if any(piece == WHITE for piece in board[0]):
-        return WHITE
-    if any(piece == BLACK for piece in board[-1]):
-        return BLACK
 
-    if turn == BLACK and not actions(board, BLACK):
-        return WHITE
-    if turn == WHITE and not actions(board, WHITE):
-        return BLACK
+def terminal(board: int, turn: int) -> bool:
+    """Checks if the game has reached a terminal state."""
+    return terminal_info(board, turn)[0]
+
 
-    assert False, "Utility calculation failed."
+def utility(board: int, turn: int) -> int:
+    """Evaluates the utility of the current board."""
+    _, winner, _ = terminal_info(board, turn)
+    assert winner is not None, "Utility calculation failed."
+    return winner
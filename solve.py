@@ -0,0 +1,33 @@
+"""
+This module strongly solves Hexapawn by backward induction over the packed board states.
+Pawns only ever move forward, so the game graph is acyclic and every position has a
+definite winner. Each position is solved once from its children, on first lookup, and
+memoized, so repeated lookups of a position are a single cache hit.
+
+Functions:
+    - solve(board: int, turn: int) -> tuple[int, Move | None]:
+        Returns the winner under perfect play and the best move for `turn`
+        (None if the game is already over).
+
+Example Usage:
+    winner, move = solve(board, BLACK)
+    if move is not None:  # None when the game is already over
+        depart, dest = move
+"""
+from functools import lru_cache
+
+from hexapawn import Move, next_player, result, terminal_info
+
+
+@lru_cache(maxsize=None)
+def solve(board: int, turn: int) -> tuple[int, Move | None]:
+    """Returns the winner under perfect play and the move `turn` should make to get there."""
+    game_over, winner, possible_moves = terminal_info(board, turn)
+    if game_over:
+        return winner, None
+
+    winners = [solve(result(board, *move), next_player(turn))[0] for move in possible_moves]
+    for move, move_winner in zip(possible_moves, winners):
+        if move_winner == turn:
+            return turn, move
+    return next_player(turn), possible_moves[0]